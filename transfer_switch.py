@@ -26,8 +26,8 @@ import logging
 import sys
 import subprocess
 import os
-import time
 import dbus
+import dbus.lowlevel
 from gi.repository import GLib
 sys.path.insert(1, "/opt/victronenergy/dbus-systemcalc-py/ext/velib_python")
 from vedbus import VeDbusService
@@ -37,11 +37,41 @@ from settingsdevice import SettingsDevice
 
 dbusSettingsPath = "com.victronenergy.settings"
 dbusSystemPath = "com.victronenergy.system"
+busItemInterface = "com.victronenergy.BusItem"
+digitalInputPrefix = "com.victronenergy.digitalinput"
+vebusPrefix = "com.victronenergy.vebus"
+
+# transfer switch digital input /State values: 12 or 3 when on generator, 13 or 2 when on grid
+stateToOnGenerator = { 12: True, 3: True, 13: False, 2: False }
+
+# BusItem values that are written repeatedly - wrapped once here rather than on every SetValue
+dbusZero = wrap_dbus_value (0)
+dbusOne = wrap_dbus_value (1)
+dbusGeneratorInputType = wrap_dbus_value (2)
+
+# transfer switch location when no Multi/Quattro is available
+noLocation = lambda: 0
+
+# current limit settings for each profile: (where the outgoing limit is saved, the limit that is restored)
+transferProfiles = {
+    'grid': ('generatorCurrentLimit', 'gridCurrentLimit'),
+    'generator': ('gridCurrentLimit', 'generatorCurrentLimit'),
+}
+
+
+# returns True if on generator, False if on grid or None if not a transfer switch state
+#   an invalid /State is an empty array, which can't be used as a dict key
+def onGeneratorFromState (state):
+    if isinstance (state, int):
+        return stateToOnGenerator.get (state)
+    return None
 
 
 class Monitor:
 
-    def getVeBusObjects (self):
+    # vebusServiceText is the /VebusService text when it is already known (from a signal)
+    #   otherwise it is read from the system service
+    def getVeBusObjects (self, vebusServiceText=None):
         vebusService = ""
 
         # invalidate all local parameters if transfer switch is not active
@@ -49,14 +79,15 @@ class Monitor:
             # release generator override if it's still active
             try:
                 if self.remoteGeneratorSelectedItem != None:
-                    self.remoteGeneratorSelectedItem.SetValue (wrap_dbus_value (0))
-            except:
-                logging.error ("could not release /Ac/Control/RemoteGeneratorSelected")
+                    self.remoteGeneratorSelectedItem.SetValue (dbusZero, dbus_interface=busItemInterface)
+            except dbus.exceptions.DBusException as e:
+                logging.error ("could not release /Ac/Control/RemoteGeneratorSelected: %s", e)
                 pass
             self.remoteGeneratorSelectedItem = None
             self.remoteGeneratorSelectedLocalValue = -1
             self.dbusOk = False
             self.numberOfAcInputs = 0
+            self.computeLocation = noLocation
             self.acInputTypeObj = None
             self.veBusService = ""
             self.transferSwitchLocation = 0
@@ -66,9 +97,11 @@ class Monitor:
             return
 
         try:
-            obj = self.theBus.get_object (dbusSystemPath, '/VebusService')
-            vebusService = obj.GetText ()
-        except dbus.exceptions.DBusException as e: # Catch specific D-Bus exceptions
+            if vebusServiceText != None:
+                vebusService = vebusServiceText
+            else:
+                vebusService = self.vebusServiceObj.GetText ()
+        except dbus.exceptions.DBusException as e:
             if self.dbusOk: # Logs if it disappeared
                 logging.info ("Multi/Quattro disappeared - /VebusService invalid: %s", e)
             elif not self.veBusFoundInitially and not self.loggedVeBusInitialNotFound: # Logs only once if never found initially
@@ -77,20 +110,15 @@ class Monitor:
             self.veBusService = ""
             self.dbusOk = False
             self.numberOfAcInputs = 0
+            self.computeLocation = noLocation
             self.acInputTypeObj = None
-        except Exception as e: # Catch any other unexpected errors
-            if not self.veBusFoundInitially and not self.loggedVeBusInitialNotFound:
-                logging.warning("Multi/Quattro (VE.Bus) service not found on startup (unexpected error): %s", e)
-                self.loggedVeBusInitialNotFound = True
-            else:
-                logging.error("An unexpected error occurred while looking for VE.Bus service: %s", e)
-            self.veBusService = ""
-            self.dbusOk = False
-            self.numberOfAcInputs = 0
-            self.acInputTypeObj = None
+            self.transferSwitchLocation = 0
 
 
-        if vebusService == "---":
+        # vebusService is empty if /VebusService could not be read - there is nothing to rebuild
+        if vebusService == "":
+            pass
+        elif vebusService == "---":
             if self.veBusService != "": # Logs if it disappeared
                 logging.info ("Multi/Quattro disappeared")
             elif not self.veBusFoundInitially and not self.loggedVeBusInitialNotFound: # Logs only once if never found initially
@@ -99,10 +127,19 @@ class Monitor:
             self.veBusService = ""
             self.dbusOk = False
             self.numberOfAcInputs = 0
+            self.computeLocation = noLocation
+            self.acInputTypeObj = None
+            self.transferSwitchLocation = 0
         elif self.veBusService == "" or vebusService != self.veBusService:
             self.veBusService = vebusService
+            # force the AC input proxy to be reselected below for the new service
+            self.acInputTypeObj = None
+            self.transferSwitchLocation = 0
             try:
-                self.numberOfAcInputs = self.theBus.get_object (vebusService, "/Ac/NumberOfAcInputs").GetValue ()
+                numberOfAcInputs = self.theBus.get_object (vebusService, "/Ac/NumberOfAcInputs",
+                    introspect=False).GetValue ()
+                # the value is invalid while the Multi/Quattro is starting up
+                self.numberOfAcInputs = numberOfAcInputs if isinstance (numberOfAcInputs, int) else 0
                 # Set flag to true if discovery successful, and reset initial not found log flag
                 self.veBusFoundInitially = True
                 self.loggedVeBusInitialNotFound = False # Reset if service is now found
@@ -110,22 +147,22 @@ class Monitor:
                 logging.error("Failed to get /Ac/NumberOfAcInputs for %s: %s", vebusService, e)
                 self.numberOfAcInputs = 0
                 self.veBusFoundInitially = False # Reset if subsequent obj fails
-            except Exception as e:
-                logging.error("An unexpected error occurred getting number of AC inputs: %s", e)
-                self.numberOfAcInputs = 0
-                self.veBusFoundInitially = False
+
+            # the AC input count is fixed for a VE.Bus service, so pick how the location is found once here
+            if self.numberOfAcInputs == 0:
+                self.computeLocation = noLocation
+            elif self.numberOfAcInputs == 1:
+                self.computeLocation = lambda: 1
+            else:
+                self.computeLocation = lambda: 2 if self.transferSwitchOnAc2 == 1 else 1
 
             try:
                 self.remoteGeneratorSelectedItem = self.theBus.get_object (vebusService,
-                    "/Ac/Control/RemoteGeneratorSelected")
+                    "/Ac/Control/RemoteGeneratorSelected", introspect=False)
             except dbus.exceptions.DBusException as e:
                 logging.error("Failed to get /Ac/Control/RemoteGeneratorSelected for %s: %s", vebusService, e)
                 self.remoteGeneratorSelectedItem = None
                 self.remoteGeneratorSelectedLocalValue = -1
-            except Exception as e:
-                logging.error("An unexpected error occurred getting remote generator selected: %s", e)
-                self.remoteGeneratorSelectedItem = None
-                self.remoteGeneratorSelectedLocalValue = -1
 
 
             if self.numberOfAcInputs == 0:
@@ -133,213 +170,369 @@ class Monitor:
                 if self.veBusFoundInitially: # If it was found but inputs couldn't be read
                     logging.error("VE.Bus service found but no AC inputs or other critical objects. Multi/Quattro might be misconfigured or starting up.")
                 self.veBusFoundInitially = False # Reset if initial object discovery failed
+                # forget the service so discovery is retried on the next pass
+                self.veBusService = ""
             elif self.numberOfAcInputs == 2:
-                logging.info ("discovered Quattro at " + vebusService)
+                logging.info ("discovered Quattro at %s", vebusService)
             elif self.numberOfAcInputs == 1:
-                logging.info ("discovered Multi at " + vebusService)
+                logging.info ("discovered Multi at %s", vebusService)
 
             try:
-                self.currentLimitObj = self.theBus.get_object (vebusService, "/Ac/ActiveIn/CurrentLimit")
-                self.currentLimitIsAdjustableObj = self.theBus.get_object (vebusService, "/Ac/ActiveIn/CurrentLimitIsAdjustable")
+                self.currentLimitObj = self.theBus.get_object (vebusService, "/Ac/ActiveIn/CurrentLimit",
+                    introspect=False)
+                self.currentLimitIsAdjustableObj = self.theBus.get_object (vebusService,
+                    "/Ac/ActiveIn/CurrentLimitIsAdjustable", introspect=False)
             except dbus.exceptions.DBusException as e:
                 logging.error ("current limit dbus setup failed - changes can't be made: %s", e)
+                self.currentLimitObj = None
+                self.currentLimitIsAdjustableObj = None
                 self.dbusOk = False
                 self.veBusFoundInitially = False # Reset if this critical object fails
-            except Exception as e:
-                logging.error("An unexpected error occurred setting up current limit objects: %s", e)
-                self.dbusOk = False
-                self.veBusFoundInitially = False
+                self.veBusService = "" # retry on the next pass
 
 
         # check to see where the transfer switch is connected
-        if self.numberOfAcInputs == 0:
-            transferSwitchLocation = 0
-        elif self.numberOfAcInputs == 1:
-            transferSwitchLocation = 1
-        elif self.DbusSettings['transferSwitchOnAc2'] == 1:
-            transferSwitchLocation = 2
-        else:
-            transferSwitchLocation = 1
+        transferSwitchLocation = self.computeLocation ()
 
         # if changed, trigger refresh of object pointers
         if transferSwitchLocation != self.transferSwitchLocation:
             if transferSwitchLocation != 0:
-                logging.info ("Transfer switch is on AC %d in" % transferSwitchLocation)
+                logging.info ("Transfer switch is on AC %d in", transferSwitchLocation)
             self.transferSwitchLocation = transferSwitchLocation
-            try:
-                if self.transferSwitchLocation == 2:
-                    self.acInputTypeObj = self.theBus.get_object (dbusSettingsPath, "/Settings/SystemSetup/AcInput2")
-                else:
-                    self.acInputTypeObj = self.theBus.get_object (dbusSettingsPath, "/Settings/SystemSetup/AcInput1")
-                self.dbusOk = True
-            except dbus.exceptions.DBusException as e:
-                self.dbusOk = False
-                logging.error ("AC input dbus setup failed - changes can't be made: %s", e)
-            except Exception as e:
-                self.dbusOk = False
-                logging.error("An unexpected error occurred setting up AC input objects: %s", e)
+            # both AC input proxies are created at startup - just select the right one
+            if self.transferSwitchLocation == 2:
+                self.acInputTypeObj = self.acInput2Obj
+            else:
+                self.acInputTypeObj = self.acInput1Obj
+            # changes can only be made if the current limit objects were set up
+            self.dbusOk = self.currentLimitObj != None and self.currentLimitIsAdjustableObj != None
 
 
+    # the transfer switch input is read asynchronously so the main loop is not blocked waiting for it
+    #   transferSwitchChecked then finishes the pass with the VE.Bus update and reconcile
     def updateTransferSwitchState (self):
-        inputValid = False
-        # If a transfer switch input is currently active, check its name
-        if self.transferSwitchActive and self.transferSwitchNameObj:
-            try:
-                name = self.transferSwitchNameObj.GetValue()
-                if self.extTransferDigInputName.lower() in name.lower():
-                    # Name matches, now check the state
-                    state = self.transferSwitchStateObj.GetValue()
-                    # Updated state check: 12 or 3 for onGenerator (true), 13 or 2 for not onGenerator (false)
-                    if state in (12, 3):  # On generator
-                        inputValid = True
-                        self.onGenerator = True
-                    elif state in (13, 2): # On grid
-                        inputValid = True
-                        self.onGenerator = False
-                else:
-                    logging.info("Current transfer switch input name '%s' does not match '%s'", name, self.extTransferDigInputName)
-            except dbus.exceptions.DBusException as e:
-                logging.error("Error accessing transfer switch D-Bus object: %s", e)
-                # If there's a D-Bus error, assume the input is no longer valid
-                inputValid = False
-            except Exception as e:
-                logging.error("An unexpected error occurred: %s", e)
-                inputValid = False
+        # If a transfer switch input is currently active, check its name and state
+        if self.transferSwitchActive and self.transferSwitchInputObj:
+            inputObj = self.transferSwitchInputObj
+            # name and state are read together in one round trip from the service root
+            inputObj.GetValue (dbus_interface=busItemInterface,
+                reply_handler=lambda values: self.transferSwitchValuesReceived (inputObj, values),
+                error_handler=lambda e: self.transferSwitchValuesError (inputObj, e))
+        else:
+            self.transferSwitchChecked (False)
 
+    def transferSwitchValuesReceived (self, inputObj, values):
+        # ignore replies from an input that has been replaced while the read was in progress
+        if inputObj is not self.transferSwitchInputObj:
+            return
+        inputValid = False
+        try:
+            name = values.get ('CustomName', "")
+            if self.extTransferDigInputKey in name.casefold():
+                # Name matches, now check the state
+                onGenerator = onGeneratorFromState (values.get ('State'))
+                if onGenerator != None:
+                    inputValid = True
+                    self.onGenerator = onGenerator
+            else:
+                logging.info("Current transfer switch input name '%s' does not match '%s'", name, self.extTransferDigInputName)
+        except Exception as e:
+            logging.error("An unexpected error occurred: %s", e)
+            inputValid = False
+        self.transferSwitchChecked (inputValid)
+
+    def transferSwitchValuesError (self, inputObj, e):
+        if inputObj is not self.transferSwitchInputObj:
+            return
+        logging.error("Error accessing transfer switch D-Bus object: %s", e)
+        # If there's a D-Bus error, assume the input is no longer valid
+        self.transferSwitchChecked (False)
 
+    def transferSwitchChecked (self, inputValid):
         if not inputValid and self.transferSwitchActive:
             logging.info ("Transfer switch digital input no longer valid or name mismatch")
             self.transferSwitchActive = False
-            self.transferSwitchNameObj = None # Clear the name object as it's no longer valid
-
-        # current digital input (if any) not valid or name mismatch
-        # search for a new one only every 10 seconds to avoid unnecessary processing
-        elif not inputValid and self.tsInputSearchDelay >= 10:
-            newInputService = ""
-            custom_name = "" # Initialize custom_name here for scope
-            found = False # Flag to indicate if a service was found
-            for service in self.theBus.list_names():
-                # found a digital input service, now check for custom name and valid state
-                if service.startswith ("com.victronenergy.digitalinput"):
-                    try:
-                        name_obj = self.theBus.get_object(service, '/CustomName')
-                        custom_name_val = name_obj.GetValue() # Use a temporary variable
-                        if self.extTransferDigInputName.lower() in custom_name_val.lower():
-                            state_obj = self.theBus.get_object (service, '/State')
-                            state = state_obj.GetValue()
-                            # found it! Check for new state values
-                            if state in (12, 3) or state in (13, 2):
-                                newInputService = service
-                                custom_name = custom_name_val # Assign to the outer custom_name
-                                self.transferSwitchNameObj = name_obj # Store the name object
-                                self.transferSwitchStateObj = state_obj # Store the state object
-                                found = True
-                                break # Exit loop once found
-                    # ignore errors - continue to check for other services
-                    except dbus.exceptions.DBusException as e:
-                        # This typically means /CustomName or /State doesn't exist for this service
-                        # logging.debug("D-Bus error for service %s: %s", service, e) # Too verbose for regular logging
-                        pass
-                    except Exception as e:
-                        logging.error("An unexpected error occurred while searching for digital inputs: %s", e)
-
-
-            # Process search results
-            if found:
-                logging.info ("discovered transfer switch digital input service at %s with custom name '%s'", newInputService, custom_name)
-                self.transferSwitchActive = True
-                self.firstSearchDone = True # Mark that a switch has been found
-            else:
-                # Log if it was previously active and is no longer found
-                if self.transferSwitchActive:
-                    logging.info ("Transfer switch digital input service NOT found with matching name")
-                    self.transferSwitchActive = False
-                # Log a message on the first search attempt if nothing is found
-                elif not self.firstSearchDone:
-                    logging.warning("No transfer switch digital input found with a custom name matching 'transfer switch'")
-                    self.firstSearchDone = True # Ensure this message is only logged once
-
-        if self.transferSwitchActive:
-            self.tsInputSearchDelay = 0
-        else:
-            self.onGenerator = False
-            # if search delay timer is active, increment it now
-            if self.tsInputSearchDelay < 10:
-                self.tsInputSearchDelay += 1
-            else:
-                self.tsInputSearchDelay = 0
+            self.transferSwitchInputObj = None # Clear the input object as it's no longer valid
+            self.transferSwitchService = ""
+            self.removeInputSignals ()
 
+        if not self.transferSwitchActive:
+            self.onGenerator = False
 
-    def transferToGrid (self):
-        if self.dbusOk:
-            logging.info ("switching to grid settings")
-            # save current values for restore when switching back to generator
+        self.getVeBusObjects ()
+        self.scheduleReconcile ()
+
+
+    # current digital input (if any) not valid or name mismatch
+    # search for a new one on its own 10 second timer - the transfer switch input rarely changes
+    #   so there is no need to check for it at the background rate
+    def searchTimerExpired (self):
+        self.searchForTransferSwitch ()
+        return GLib.SOURCE_CONTINUE
+
+    def searchForTransferSwitch (self):
+        if not self.transferSwitchActive and self.searchPending == 0:
+            self.searchFound = None
+            # check known digital input services for custom name and valid state
+            #   services whose cached name does not match are skipped without any D-Bus I/O
+            for service, name in self.digitalInputNames.items ():
+                if name != None and self.extTransferDigInputKey not in name:
+                    continue
+                # the root object returns all paths of the service in one round trip
+                # all services are queried at once and the replies are handled as they arrive
+                #   so the search takes one round trip rather than one per digital input
+                # replies are only dispatched from the main loop so the count can be raised after the call
+                #   a call that fails here is not counted, otherwise the search would never run again
+                try:
+                    self.theBus.call_async (service, '/', busItemInterface, 'GetValue', '', (),
+                        reply_handler=lambda values, service=service: self.searchReply (service, values),
+                        error_handler=lambda e, service=service: self.searchError (service, e))
+                except dbus.exceptions.DBusException as e:
+                    logging.debug ("D-Bus error for service %s: %s", service, e)
+                    continue
+                self.searchPending += 1
+            if self.searchPending == 0:
+                self.searchDone ()
+
+
+    def searchReply (self, service, values):
+        try:
+            custom_name = values.get ('CustomName', "")
+            folded_name = custom_name.casefold()
+            if service in self.digitalInputNames:
+                self.digitalInputNames[service] = folded_name
+            if self.searchFound == None and self.extTransferDigInputKey in folded_name:
+                state = values.get ('State')
+                # found it! Check for new state values
+                if onGeneratorFromState (state) != None:
+                    self.searchFound = (service, custom_name)
+        except Exception as e:
+            logging.error("An unexpected error occurred while searching for digital inputs: %s", e)
+        self.searchReplyReceived ()
+
+    # ignore errors - the other services are still checked
+    def searchError (self, service, e):
+        # This typically means the service went away while it was being checked
+        # only formatted when debug logging is enabled
+        logging.debug ("D-Bus error for service %s: %s", service, e)
+        self.searchReplyReceived ()
+
+    def searchReplyReceived (self):
+        self.searchPending -= 1
+        if self.searchPending == 0:
+            self.searchDone ()
+
+    # Process search results once all digital inputs have replied
+    def searchDone (self):
+        if self.searchFound != None:
+            newInputService, custom_name = self.searchFound
             try:
-                self.DbusSettings['generatorCurrentLimit'] = self.currentLimitObj.GetValue ()
-            except:
-                logging.error ("dbus error generator AC input current limit not saved switching to grid")
+                self.transferSwitchInputObj = self.theBus.get_object (newInputService, '/', introspect=False)
+            except dbus.exceptions.DBusException as e:
+                logging.error ("could not access transfer switch digital input %s: %s", newInputService, e)
+                return
+            self.transferSwitchService = newInputService
+            logging.info ("discovered transfer switch digital input service at %s with custom name '%s'", newInputService, custom_name)
+            self.transferSwitchActive = True
+            self.firstSearchDone = True # Mark that a switch has been found
+            self.addInputSignals (newInputService)
+            # pick up the current state now rather than on the next background pass
+            self.background ()
+        # Log a message on the first search attempt if nothing is found
+        elif not self.firstSearchDone:
+            logging.warning("No transfer switch digital input found with a custom name matching 'transfer switch'")
+            self.firstSearchDone = True # Ensure this message is only logged once
+
+
+    # subscribe to /State and /CustomName changes of the transfer switch digital input
+    #   so a transfer or rename is processed as soon as it happens rather than on the next background pass
+    def addInputSignals (self, service):
+        self.removeInputSignals ()
+        try:
+            for path, handler in (('/State', self.inputStateChanged), ('/CustomName', self.inputNameChanged)):
+                self.inputSignalMatches.append (self.theBus.add_signal_receiver (handler,
+                    dbus_interface=busItemInterface, signal_name='PropertiesChanged', bus_name=service, path=path))
+        except dbus.exceptions.DBusException as e:
+            logging.error ("could not subscribe to transfer switch input changes: %s", e)
+
+    def removeInputSignals (self):
+        for match in self.inputSignalMatches:
+            match.remove ()
+        self.inputSignalMatches = []
+
+    def busMessageFilter (self, bus, message):
+        if message.is_signal ('org.freedesktop.DBus', 'NameOwnerChanged'):
+            self.nameOwnerChanged (*message.get_args_list ())
+        return dbus.lowlevel.HANDLER_RESULT_NOT_YET_HANDLED
+
+    # keep the list of digital input services current without rescanning the bus
+    #   and drop the cached VE.Bus proxies when that service restarts
+    def nameOwnerChanged (self, name, oldOwner, newOwner):
+        if name == self.veBusService:
+            # proxies are bound to the old owner - stop using them and rebuild them now
+            if newOwner != "":
+                self.veBusService = ""
+                self.dbusOk = False
+                self.getVeBusObjects ()
+                self.scheduleReconcile ()
+            return
+        if not name.startswith (digitalInputPrefix):
+            return
+        if newOwner != "":
+            self.addDigitalInput (name)
+            # a new digital input may be the transfer switch - search now
+            self.searchForTransferSwitch ()
+        else:
+            self.removeDigitalInput (name)
+            # the transfer switch input went away - drop it now instead of waiting for a call to it to fail
+            if name == self.transferSwitchService:
+                self.transferSwitchChecked (False)
+
+    # digital input registry: service name -> case-folded custom name (None until first read)
+    #   names are kept current from /CustomName PropertiesChanged so a search only reads matching inputs
+    def addDigitalInput (self, service):
+        self.removeDigitalInput (service)
+        self.digitalInputNames[service] = None
+        try:
+            self.digitalInputNameMatches[service] = self.theBus.add_signal_receiver (
+                lambda changes, service=service: self.digitalInputNameChanged (service, changes),
+                dbus_interface=busItemInterface, signal_name='PropertiesChanged', bus_name=service, path='/CustomName')
+        except dbus.exceptions.DBusException as e:
+            logging.error ("could not subscribe to %s custom name changes: %s", service, e)
+
+    def removeDigitalInput (self, service):
+        match = self.digitalInputNameMatches.pop (service, None)
+        if match != None:
+            match.remove ()
+        self.digitalInputNames.pop (service, None)
+
+    def digitalInputNameChanged (self, service, changes):
+        if service not in self.digitalInputNames:
+            return
+        name = changes.get ('Value')
+        if isinstance (name, str):
+            self.digitalInputNames[service] = name.casefold()
+            # renamed to the transfer switch - search now
+            if self.extTransferDigInputKey in self.digitalInputNames[service]:
+                self.searchForTransferSwitch ()
+        else:
+            self.digitalInputNames[service] = None
+
+    # signal handlers - each updates only the state it affects, then acts on the result
+    # the new state arrives with the signal so the input does not need to be read again
+    def inputStateChanged (self, changes):
+        onGenerator = onGeneratorFromState (changes.get ('Value'))
+        if onGenerator != None:
+            self.onGenerator = onGenerator
+        else:
+            # not a transfer switch state - let the full check decide if the input is still valid
+            self.updateTransferSwitchState ()
+            return
+        self.scheduleReconcile ()
 
-            try:
-                self.acInputTypeObj.SetValue (self.DbusSettings['gridInputType'])
-            except:
-                logging.error ("dbus error AC input type not changed to grid")
-            try:
-                if self.currentLimitIsAdjustableObj.GetValue () == 1:
-                    self.currentLimitObj.SetValue (wrap_dbus_value (self.DbusSettings['gridCurrentLimit']))
-                else:
-                    logging.warning ("Input current limit not adjustable - not changed")
-            except:
-                logging.error ("dbus error AC input current limit not changed switching to grid")
-
-    def transferToGenerator (self):
-        if self.dbusOk:
-            logging.info ("switching to generator settings")
-            # save current values for restore when switching back to grid
+    def inputNameChanged (self, changes):
+        self.updateTransferSwitchState ()
+
+    def vebusServiceChanged (self, changes):
+        self.getVeBusObjects (changes.get ('Text'))
+        self.scheduleReconcile ()
+
+    # SettingsDevice calls this when one of our settings is changed on D-Bus
+    #   only the transfer switch AC input selection is cached, the other settings are read when used
+    def settingChanged (self, setting, oldValue, newValue):
+        if setting == 'transferSwitchOnAc2':
+            self.transferSwitchOnAc2 = newValue
+            self.getVeBusObjects ()
+            self.scheduleReconcile ()
+
+
+    # switch the AC input to the grid or generator settings
+    #   the current limit in use is saved to the profile being left before the new one is restored
+    def applyProfile (self, target):
+        if not self.dbusOk:
+            return
+        saveLimitKey, restoreLimitKey = transferProfiles[target]
+        logging.info ("switching to %s settings", target)
+        restoreLimit = self.DbusSettings[restoreLimitKey]
+
+        # save current values for restore when switching back
+        inputType = None
+        if target == 'generator':
             try:
                 inputType = self.acInputTypeObj.GetValue ()
+                gridInputType = inputType
                 # grid input type can only be either 1 (grid) or 3 (shore)
                 #    patch this up to prevent issues later
-                if inputType == 2:
+                if gridInputType == 2:
                     logging.warning ("grid input can not be generator - setting to grid")
-                    inputType = 1
-                self.DbusSettings['gridInputType'] = inputType
-            except:
-                logging.error ("dbus error AC input type not saved when switching to generator")
-            try:
-                self.DbusSettings['gridCurrentLimit'] = self.currentLimitObj.GetValue ()
-            except:
-                logging.error ("dbus error AC input current limit not saved when switching to generator")
+                    gridInputType = 1
+                self.DbusSettings['gridInputType'] = gridInputType
+            except dbus.exceptions.DBusException as e:
+                logging.error ("dbus error AC input type not saved when switching to generator: %s", e)
+            newInputType = dbusGeneratorInputType
+        else:
+            newInputType = wrap_dbus_value (self.DbusSettings['gridInputType'])
+        currentLimit = None
+        try:
+            currentLimit = self.currentLimitObj.GetValue ()
+            self.DbusSettings[saveLimitKey] = currentLimit
+        except dbus.exceptions.DBusException as e:
+            logging.error ("dbus error AC input current limit not saved when switching to %s: %s", target, e)
 
-            try:
-                self.acInputTypeObj.SetValue (2)
-            except:
-                logging.error ("dbus error AC input type not changed when switching to generator")
-            try:
-                if self.currentLimitIsAdjustableObj.GetValue () == 1:
-                    self.currentLimitObj.SetValue (wrap_dbus_value (self.DbusSettings['generatorCurrentLimit']))
-                else:
-                    logging.warning ("Input current limit not adjustable - not changed")
-            except:
-                logging.error ("dbus error AC input current limit not changed when switching to generator")
+        try:
+            # input is already set to generator - skip the write
+            if target != 'generator' or inputType != 2:
+                self.acInputTypeObj.SetValue (newInputType, dbus_interface=busItemInterface)
+        except dbus.exceptions.DBusException as e:
+            logging.error ("dbus error AC input type not changed when switching to %s: %s", target, e)
+        try:
+            # limit is already at the restored value - skip the adjustable check and the write
+            if currentLimit == restoreLimit:
+                pass
+            elif self.currentLimitIsAdjustableObj.GetValue () == 1:
+                self.currentLimitObj.SetValue (dbus.Double (restoreLimit, variant_level=1), dbus_interface=busItemInterface)
+            else:
+                logging.warning ("Input current limit not adjustable - not changed")
+        except dbus.exceptions.DBusException as e:
+            logging.error ("dbus error AC input current limit not changed when switching to %s: %s", target, e)
 
 
+    # full resync of all state - runs on a slow timer in case a signal was missed
     def background (self):
 
-        ##startTime = time.time()
+        # forget the cached digital input names so a missed /CustomName change
+        #   is picked up by the next search rather than hiding the input for good
+        self.digitalInputNames = dict.fromkeys (self.digitalInputNames)
+        # the VE.Bus update and reconcile run when the transfer switch input has been read
         self.updateTransferSwitchState ()
-        self.getVeBusObjects ()
+        return GLib.SOURCE_CONTINUE
+
 
+    # a burst of signals (e.g. state and name changing together) is coalesced into one reconcile
+    #   which runs once the main loop has dispatched all pending messages
+    def scheduleReconcile (self):
+        if not self.reconcilePending:
+            self.reconcilePending = True
+            GLib.idle_add (self.reconcileIdle)
+
+    def reconcileIdle (self):
+        self.reconcilePending = False
+        self.reconcile ()
+        return GLib.SOURCE_REMOVE
+
+    # act on the current state - switch settings on a transition and update RemoteGeneratorSelected
+    def reconcile (self):
         # skip processing if any dbus paramters were not initialized properly
         if self.dbusOk and self.transferSwitchActive:
             # process transfer switch state change
             if self.lastOnGenerator != None and self.onGenerator != self.lastOnGenerator:
                 if self.onGenerator:
-                    self.transferToGenerator ()
+                    self.applyProfile ('generator')
                 else:
-                    self.transferToGrid ()
+                    self.applyProfile ('grid')
             self.lastOnGenerator = self.onGenerator
         elif self.onGenerator:
-            self.transferToGrid ()
+            self.applyProfile ('grid')
 
         # update main VE.Bus RemoteGeneratorSelected which is used to enable grid charging
         #    if renewable energy is turned on
@@ -351,17 +544,14 @@ class Monitor:
             self.remoteGeneratorSelectedLocalValue = -1
         elif newRemoteGeneratorSelectedLocalValue != self.remoteGeneratorSelectedLocalValue:
             try:
-                self.remoteGeneratorSelectedItem.SetValue (wrap_dbus_value (newRemoteGeneratorSelectedLocalValue))
-            except:
-                logging.error ("could not set /Ac/Control/RemoteGeneratorSelected")
+                self.remoteGeneratorSelectedItem.SetValue (dbusOne if newRemoteGeneratorSelectedLocalValue == 1 else dbusZero,
+                    dbus_interface=busItemInterface)
+            except dbus.exceptions.DBusException as e:
+                logging.error ("could not set /Ac/Control/RemoteGeneratorSelected: %s", e)
                 pass
 
             self.remoteGeneratorSelectedLocalValue = newRemoteGeneratorSelectedLocalValue
 
-        ##stopTime = time.time()
-        ##print ("#### background time %0.3f" % (stopTime - startTime))
-        return True
-
 
     def __init__(self):
         self.theBus = dbus.SystemBus()
@@ -370,21 +560,26 @@ class Monitor:
         self.lastVeBusService = ""
         self.acInputTypeObj = None
         self.numberOfAcInputs = 0
+        self.computeLocation = noLocation # returns the AC input the transfer switch is on, 0 if none
         self.currentLimitObj = None
         self.currentLimitIsAdjustableObj = None
         self.remoteGeneratorSelectedItem = None
         self.remoteGeneratorSelectedLocalValue = -1
 
-        self.transferSwitchStateObj = None
-        self.transferSwitchNameObj = None # New attribute to store the D-Bus object for CustomName
+        self.transferSwitchInputObj = None # root object of the transfer switch digital input service
+        self.transferSwitchService = ""
+        self.inputSignalMatches = [] # PropertiesChanged matches on the transfer switch digital input
         self.extTransferDigInputName = "transfer switch"    # Changed to just 'transfer switch' as the key phrase
+        self.extTransferDigInputKey = self.extTransferDigInputName.casefold() # folded once for case-insensitive matching
 
         self.lastOnGenerator = None
+        self.reconcilePending = False
         self.transferSwitchActive = False
         self.dbusOk = False
         self.transferSwitchLocation = 0
-        self.tsInputSearchDelay = 99 # allow search to occur immediately
         self.firstSearchDone = False # New attribute to track the initial search status
+        self.searchPending = 0 # number of digital inputs that have not yet replied to the search
+        self.searchFound = None # (service, custom name) of the first matching digital input
         self.veBusFoundInitially = False
         self.loggedVeBusInitialNotFound = False
 
@@ -398,7 +593,16 @@ class Monitor:
             'transferSwitchOnAc2': [ '/Settings/TransferSwitch/TransferSwitchOnAc2', 0, 0, 0 ],
                         }
         self.DbusSettings = SettingsDevice(bus=self.theBus, supportedSettings=settingsList,
-                                timeout = 10, eventCallback=None )
+                                timeout = 10, eventCallback=self.settingChanged )
+        # kept up to date by settingChanged
+        self.transferSwitchOnAc2 = self.DbusSettings['transferSwitchOnAc2']
+
+        # settings is always present (SettingsDevice above waits for it)
+        #   so the AC input type proxies are created once here and follow localsettings restarts
+        self.acInput1Obj = self.theBus.get_object (dbusSettingsPath, "/Settings/SystemSetup/AcInput1",
+                            introspect=False, follow_name_owner_changes=True)
+        self.acInput2Obj = self.theBus.get_object (dbusSettingsPath, "/Settings/SystemSetup/AcInput2",
+                            introspect=False, follow_name_owner_changes=True)
 
         # grid input type should be either 1 (grid) or 3 (shore)
         #    patch this up to prevent issues later
@@ -406,7 +610,36 @@ class Monitor:
             logging.warning ("grid input type was generator - resetting to grid")
             self.DbusSettings['gridInputType'] = 1
 
-        GLib.timeout_add (1000, self.background)
+        # the system service proxy is fetched once and reused every pass
+        #   it follows owner changes so it survives a systemcalc restart
+        #   and can be created before systemcalc is on the bus
+        # introspection is skipped on all proxies since only the BusItem methods are used
+        self.vebusServiceObj = self.theBus.get_object (dbusSystemPath, '/VebusService',
+                            introspect=False, follow_name_owner_changes=True)
+        # digital input services are listed once here, then tracked from NameOwnerChanged
+        self.digitalInputNames = {}
+        self.digitalInputNameMatches = {}
+        # NameOwnerChanged is only requested for the digital input and vebus name spaces
+        #   so the bus daemon filters out changes of unrelated services
+        #   add_signal_receiver can only match exact arguments so the match and dispatch are done here
+        for nameSpace in (digitalInputPrefix, vebusPrefix):
+            self.theBus.add_match_string_non_blocking ("type='signal',sender='org.freedesktop.DBus',"
+                "interface='org.freedesktop.DBus',member='NameOwnerChanged',arg0namespace='%s'" % nameSpace)
+        self.theBus.add_message_filter (self.busMessageFilter)
+        for service in self.theBus.list_names ():
+            if service.startswith (digitalInputPrefix):
+                self.addDigitalInput (service)
+
+        # react to the Multi/Quattro appearing, disappearing or changing immediately
+        self.theBus.add_signal_receiver (self.vebusServiceChanged, dbus_interface=busItemInterface,
+            signal_name='PropertiesChanged', bus_name=dbusSystemPath, path='/VebusService')
+
+        # transfer switch state, name and VE.Bus service changes arrive as signals
+        #   so the background pass is only a slow resync in case a signal was missed
+        # second-granularity timers are coalesced by GLib so the device wakes up less often
+        GLib.timeout_add_seconds (30, self.background)
+        GLib.timeout_add_seconds (10, self.searchTimerExpired)
+        self.searchForTransferSwitch () # allow search to occur immediately
         return None
 
 def main():